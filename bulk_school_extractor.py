@@ -1,8 +1,11 @@
 from bs4 import BeautifulSoup
 import json
-import requests
+import re
 import time
 from datetime import datetime
+from streaming_fetch import fetch_listing_fragment, print_transfer_report
+from run_stats import RunStats
+from dead_letter_queue import load_dead_letters, save_dead_letters, record_failure, record_success, due_dead_letters
 
 def extract_schools_from_html(html_content):
     """Extract school data from HTML content"""
@@ -46,20 +49,50 @@ def get_next_page_url(html_content):
         return next_link.get('href')
     return None
 
-def scrape_schools_from_district(district_url, district_name):
-    """Scrape all schools from a district following pagination"""
-    all_schools = []
+def get_total_pages(html_content):
+    """Extract total page count from pagination ("Page 1 of 3")"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    pages = soup.find('span', class_='pages')
+    
+    if pages:
+        match = re.search(r'of\s+(\d+)', pages.get_text())
+        if match:
+            return int(match.group(1))
+    return None
+
+def get_page_url(district_url, page_num):
+    """Build the URL of a district listing page"""
+    base_url = re.sub(r'page/\d+/?$', '', district_url).rstrip('/') + '/'
+    return base_url if page_num == 1 else f"{base_url}page/{page_num}/"
+
+def iter_schools_from_district(district_url, district_name, dead_letters=None, follow_pagination=True,
+                               verbose=True, on_failure=None, stats=None):
+    """
+    Yield schools from a district page by page, following pagination
+
+    Args:
+        district_url: URL of the first listing page to fetch
+        district_name: District name stored on each school
+        dead_letters: Dead-letter queue dict to record failed pages in (optional)
+        follow_pagination: Keep going to the next page after this one
+        verbose: Print progress for every page (off when used as a library)
+        on_failure: Callable(page_url, reason) for each page that failed (optional)
+        stats: RunStats to tick for every page fetched (optional)
+    """
     current_url = district_url
-    page_num = 1
+    match = re.search(r'page/(\d+)/?$', district_url)
+    page_num = int(match.group(1)) if match else 1
+    total_pages = None
     
     while current_url:
-        print(f"  Scraping page {page_num}: {current_url}")
+        if verbose:
+            print(f"  Scraping page {page_num}: {current_url}")
         
         try:
-            # Fetch the page
-            response = requests.get(current_url, timeout=15)
-            response.raise_for_status()
-            html_content = response.text
+            # Fetch the catbox list and pagination, skipping the rest of the page
+            html_content = fetch_listing_fragment(current_url, timeout=15)
+            if stats:
+                stats.record_page()
             
             # Extract schools
             schools = extract_schools_from_html(html_content)
@@ -68,24 +101,75 @@ def scrape_schools_from_district(district_url, district_name):
             for school in schools:
                 school['school_district'] = district_name
             
-            all_schools.extend(schools)
-            print(f"  ✓ Extracted {len(schools)} schools from page {page_num}")
+            if verbose:
+                print(f"  ✓ Extracted {len(schools)} schools from page {page_num}")
             
-            # Get next page URL
-            next_url = get_next_page_url(html_content)
+            if dead_letters is not None:
+                record_success(dead_letters, current_url)
             
-            if next_url:
-                current_url = next_url
-                page_num += 1
-                time.sleep(1)  # Be polite to the server
-            else:
-                current_url = None
+            total_pages = get_total_pages(html_content) or total_pages
+            
+            # Get next page URL
+            next_url = get_next_page_url(html_content) if follow_pagination else None
                 
         except Exception as e:
-            print(f"  ✗ Error scraping page {page_num}: {e}")
+            if stats:
+                stats.record_page()
+            if verbose:
+                print(f"  ✗ Error scraping page {page_num}: {e}")
+            if on_failure:
+                on_failure(current_url, e)
+            
+            # Defer the page to the dead-letter queue instead of losing it
+            if dead_letters is not None:
+                record_failure(dead_letters, current_url, 'listing', e, {
+                    'district': district_name,
+                    # Without a page count the rest of the district has to be crawled on retry
+                    'follow_pagination': follow_pagination and total_pages is None,
+                })
+            
+            # Skip ahead to the next page when the page count is known
+            if follow_pagination and total_pages and page_num < total_pages:
+                page_num += 1
+                current_url = get_page_url(district_url, page_num)
+                continue
             break
+        
+        # Hand the page's schools to the caller before fetching the next page
+        yield from schools
+        
+        if next_url:
+            current_url = next_url
+            page_num += 1
+            time.sleep(1)  # Be polite to the server
+        else:
+            current_url = None
+
+def scrape_schools_from_district(district_url, district_name, dead_letters=None, follow_pagination=True, stats=None):
+    """Scrape all schools from a district following pagination"""
+    return list(iter_schools_from_district(district_url, district_name, dead_letters, follow_pagination, stats=stats))
+
+def retry_due_listings(dead_letters, all_schools, known_links, stats=None):
+    """Retry listing pages whose backoff has elapsed and add any schools not seen yet"""
+    added = 0
     
-    return all_schools
+    for entry in due_dead_letters(dead_letters, kind='listing'):
+        context = entry.get('context', {})
+        district_name = context.get('district', 'Unknown')
+        print(f"\n  ↻ Retrying (attempt {entry['attempts'] + 1}): {entry['url']}")
+        
+        for school in iter_schools_from_district(entry['url'], district_name, dead_letters,
+                                                 follow_pagination=context.get('follow_pagination', False),
+                                                 stats=stats):
+            if school['school_link'] in known_links:
+                continue
+            known_links.add(school['school_link'])
+            all_schools.append(school)
+            added += 1
+            if stats:
+                stats.add_listed(district_name)
+    
+    return added
 
 def load_districts(file_path='districts.json'):
     """Load districts from JSON file"""
@@ -134,6 +218,14 @@ def main():
             print("Invalid input. Processing all districts.")
     
     all_schools = []
+    known_links = set()
+    recovered_count = 0
+    # Listing runs track progress per district: school counts are only known once crawled
+    stats = RunStats(unit='districts')
+    for district in districts:
+        if district.get('url'):
+            stats.add_district(district.get('name', 'Unknown'))
+    dead_letters = load_dead_letters()
     start_time = datetime.now()
     
     # Scrape each district
@@ -149,24 +241,44 @@ def main():
         print(f"URL: {district_url}")
         
         try:
-            schools = scrape_schools_from_district(district_url, district_name)
+            schools = scrape_schools_from_district(district_url, district_name, dead_letters, stats=stats)
             all_schools.extend(schools)
+            for school in schools:
+                known_links.add(school['school_link'])
+            stats.add_listed(district_name, len(schools))
+            stats.record_district(district_name, district_url)
             print(f"  ✓ Total schools from {district_name}: {len(schools)}")
             
+            # Live status file, rewritten at most every 10 seconds
+            stats.flush_status()
+            
             # Save progress every 10 districts
             if idx % 10 == 0:
+                # Deferred retries of failed pages run between batches
+                recovered_count += retry_due_listings(dead_letters, all_schools, known_links, stats)
                 save_schools_data(all_schools, 'SchoolsData.json')
+                save_dead_letters(dead_letters)
                 print(f"\n>>> Progress saved: {len(all_schools)} schools from {idx} districts")
+                eta = stats.eta_seconds()
+                eta_text = f"{eta/60:.1f} minutes" if eta is not None else "unknown"
+                print(f">>> Districts: {stats.completed}/{stats.total} ({stats.completion_pct():.1f}%) | "
+                      f"{stats.pages_per_second():.2f} pages/sec | ETA: {eta_text}")
             
             # Small delay between districts
             time.sleep(2)
             
         except Exception as e:
             print(f"  ✗ Error processing {district_name}: {e}")
+            stats.record_failure(district_name, district_url, fetched=False)
             continue
     
+    # Last pass over failed pages that are due by now
+    recovered_count += retry_due_listings(dead_letters, all_schools, known_links, stats)
+    
     # Final save
     save_schools_data(all_schools, 'SchoolsData.json')
+    save_dead_letters(dead_letters)
+    stats.flush_status(force=True)
     
     # Summary
     end_time = datetime.now()
@@ -177,8 +289,12 @@ def main():
     print("="*70)
     print(f"Total districts processed: {len(districts)}")
     print(f"Total schools extracted: {len(all_schools)}")
+    print(f"Schools recovered on deferred retry: {recovered_count}")
     print(f"Time taken: {duration:.2f} seconds ({duration/60:.2f} minutes)")
     print(f"Output file: SchoolsData.json")
+    print_transfer_report()
+    if dead_letters:
+        print(f"Pages deferred to dead-letter queue: {len(dead_letters)} (run retry-failed.py)")
     print("="*70)
     
     # Display sample data
@@ -190,20 +306,15 @@ def main():
             print(f"   Link: {school['school_link']}")
             print(f"   Description: {school['school_description'][:80]}...")
     
-    # District-wise summary
-    district_counts = {}
-    for school in all_schools:
-        district = school['school_district']
-        district_counts[district] = district_counts.get(district, 0) + 1
-    
+    # District-wise summary (counted as districts were scraped)
     print("\n" + "="*70)
     print("DISTRICT-WISE SCHOOL COUNT:")
     print("="*70)
-    for district, count in sorted(district_counts.items(), key=lambda x: x[1], reverse=True)[:10]:
+    for district, count, _, _ in stats.district_summary('total', 10):
         print(f"{district}: {count} schools")
     
-    if len(district_counts) > 10:
-        print(f"... and {len(district_counts) - 10} more districts")
+    if len(stats.districts) > 10:
+        print(f"... and {len(stats.districts) - 10} more districts")
 
 if __name__ == "__main__":
     main()
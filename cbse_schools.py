@@ -0,0 +1,214 @@
+"""
+Library API for embedding the CBSE schools crawler
+
+All iterators are lazy: listing pages are fetched only when the caller asks
+for more schools, and detail pages are fetched at most `concurrency` at a
+time, so memory stays constant and slow consumers throttle the crawl.
+
+    from cbse_schools import iter_districts, iter_district_schools, iter_school_details
+
+    for district in iter_districts():
+        schools = iter_district_schools(district)
+        for school in iter_school_details(schools, concurrency=4):
+            sink.write(school)
+
+Async counterparts (aiter_districts, aiter_district_schools,
+aiter_school_details) run the same blocking fetches in worker threads.
+"""
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from bulk_school_extractor import iter_schools_from_district
+from hedged_fetch import HedgedFetcher
+from master_school_details_extractor import fetch_school_details
+from pincode_index import enrich_school
+
+__all__ = [
+    'iter_districts', 'iter_district_schools', 'iter_school_details',
+    'aiter_districts', 'aiter_district_schools', 'aiter_school_details',
+]
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Bundled district list, found relative to this module so embedding apps can run from anywhere
+DISTRICTS_FILE = os.path.join(BASE_DIR, 'districts.json')
+
+_DONE = object()
+
+
+def iter_districts(file_path=DISTRICTS_FILE):
+    """Yield districts ({'name': ..., 'url': ...}) from the districts file"""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        districts = json.load(file)
+    yield from districts
+
+
+def _report_page_failure(page_url, reason):
+    """Default on_failure handler for listing pages: print the page that could not be fetched"""
+    print(f"✗ Listing page failed {page_url}: {reason}")
+
+
+def iter_district_schools(district, dead_letters=None, on_failure=None):
+    """
+    Yield the schools listed for a district, one listing page at a time
+
+    Args:
+        district: District dict from iter_districts() or a district URL
+        dead_letters: Dead-letter queue dict to record failed pages in (optional)
+        on_failure: Callable(page_url, reason) for each listing page that failed (optional)
+    """
+    if isinstance(district, str):
+        district = {'name': 'Unknown', 'url': district}
+    yield from iter_schools_from_district(district['url'], district.get('name', 'Unknown'), dead_letters,
+                                          verbose=False, on_failure=on_failure or _report_page_failure)
+
+
+def _detail_fetcher(concurrency):
+    """Fetcher sized for one iterator: a primary and a hedge per concurrent fetch"""
+    return HedgedFetcher(connect_timeout=3.05, read_timeout=10, deadline=20, hedge_budget=0.1,
+                         max_workers=2 * concurrency)
+
+
+def _fetch_record(item, dead_letters, http):
+    """Fetch details for a school dict or URL; returns (merged record, None) or (school, failure reason)"""
+    if isinstance(item, str):
+        school = {'school_link': item}
+    else:
+        school = dict(item)
+
+    # Failures always go through a queue so their reason can be reported
+    url = school.get('school_link', '')
+    queue = dead_letters if dead_letters is not None else {}
+    details = fetch_school_details(url, dead_letters=queue, http=http, verbose=False)
+    if not details:
+        return school, queue.get(url, {}).get('reason', 'No school details found')
+
+    school.update(details)
+    return enrich_school(school), None
+
+
+def _report_failure(school, reason):
+    """Default on_failure handler: print the school whose details could not be fetched"""
+    print(f"✗ No details for {school.get('school_link', '')}: {reason}")
+
+
+def iter_school_details(urls, concurrency=4, dead_letters=None, on_failure=None):
+    """
+    Yield schools merged with their detail pages as each page is parsed
+
+    Records come back in completion order. At most `concurrency` pages are
+    in flight and the next school is only pulled from `urls` after a result
+    has been handed out, so a slow consumer slows the crawl instead of
+    growing a buffer. Schools whose details cannot be fetched are not
+    yielded; they are passed to on_failure (printed by default) and recorded
+    in dead_letters when given.
+
+    Args:
+        urls: Iterable of school dicts (with 'school_link') or detail page URLs
+        concurrency: Maximum number of detail pages fetched at once
+        dead_letters: Dead-letter queue dict to record failures in (optional)
+        on_failure: Callable(school, reason) for each school that failed (optional)
+    """
+    on_failure = on_failure or _report_failure
+    items = iter(urls)
+    http = _detail_fetcher(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    pending = {executor.submit(_fetch_record, item, dead_letters, http) for item in islice(items, concurrency)}
+
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                record, reason = future.result()
+                if reason is None:
+                    yield record
+                else:
+                    on_failure(record, reason)
+
+                # Pull the next school only once the caller has taken this result
+                for item in islice(items, 1):
+                    pending.add(executor.submit(_fetch_record, item, dead_letters, http))
+    finally:
+        # Closing the generator early abandons anything not yet started; fetches already
+        # running end on their own deadline and the fetcher is dropped after them
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _aiter_sync(iterator):
+    """Drive a blocking iterator from a worker thread, one item at a time"""
+    iterator = iter(iterator)
+    while True:
+        item = await asyncio.to_thread(next, iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
+
+
+async def aiter_districts(file_path=DISTRICTS_FILE):
+    """Async counterpart of iter_districts()"""
+    async for district in _aiter_sync(iter_districts(file_path)):
+        yield district
+
+
+async def aiter_district_schools(district, dead_letters=None, on_failure=None):
+    """Async counterpart of iter_district_schools()"""
+    async for school in _aiter_sync(iter_district_schools(district, dead_letters, on_failure)):
+        yield school
+
+
+async def aiter_school_details(urls, concurrency=4, dead_letters=None, on_failure=None):
+    """
+    Async counterpart of iter_school_details()
+
+    Args:
+        urls: Iterable or async iterable of school dicts or detail page URLs
+        concurrency: Maximum number of detail pages fetched at once
+        dead_letters: Dead-letter queue dict to record failures in (optional)
+        on_failure: Callable(school, reason) for each school that failed (optional)
+    """
+    on_failure = on_failure or _report_failure
+    if hasattr(urls, '__aiter__'):
+        items = urls.__aiter__()
+    else:
+        items = _aiter_sync(urls)
+
+    async def next_item():
+        try:
+            return await items.__anext__()
+        except StopAsyncIteration:
+            return _DONE
+
+    loop = asyncio.get_running_loop()
+    http = _detail_fetcher(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    pending = set()
+    exhausted = False
+
+    async def refill():
+        nonlocal exhausted
+        while not exhausted and len(pending) < concurrency:
+            item = await next_item()
+            if item is _DONE:
+                exhausted = True
+                return
+            pending.add(loop.run_in_executor(executor, _fetch_record, item, dead_letters, http))
+
+    try:
+        await refill()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                record, reason = task.result()
+                if reason is None:
+                    yield record
+                else:
+                    on_failure(record, reason)
+
+                # Pull the next school only once the caller has taken this result
+                await refill()
+    finally:
+        for task in pending:
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,96 @@
+import json
+import os
+import time
+from datetime import datetime
+
+DEAD_LETTER_FILE = 'dead_letter_queue.json'
+
+# Retry schedule: 30s, 60s, 120s, 240s ... until MAX_ATTEMPTS failures
+BASE_DELAY = 30
+MAX_DELAY = 3600
+MAX_ATTEMPTS = 5
+
+
+def load_dead_letters(file_path=DEAD_LETTER_FILE):
+    """Load the dead-letter queue (url -> entry) from JSON file"""
+    if not os.path.exists(file_path):
+        return {}
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except Exception as e:
+        print(f"✗ Error loading dead-letter queue: {e}")
+        return {}
+
+
+def save_dead_letters(queue, file_path=DEAD_LETTER_FILE):
+    """Save the dead-letter queue to JSON file"""
+    try:
+        with open(file_path, 'w', encoding='utf-8') as json_file:
+            json.dump(queue, json_file, indent=2, ensure_ascii=False)
+        return True
+    except Exception as e:
+        print(f"✗ Error saving dead-letter queue: {e}")
+        return False
+
+
+def record_failure(queue, url, kind, reason, context=None):
+    """
+    Record a failed URL and schedule its next retry with exponential backoff
+
+    Args:
+        queue: Dead-letter queue dict (modified in place)
+        url: URL that failed
+        kind: 'listing' for district pages, 'detail' for school pages
+        reason: Failure reason (exception text)
+        context: Extra data needed to retry (e.g. district name)
+    """
+    now = time.time()
+    entry = queue.get(url) or {
+        'url': url,
+        'kind': kind,
+        'attempts': 0,
+        'first_failed': datetime.now().isoformat(timespec='seconds'),
+        'context': context or {},
+    }
+
+    entry['attempts'] += 1
+    entry['reason'] = str(reason)
+    entry['last_failed'] = datetime.now().isoformat(timespec='seconds')
+    if context:
+        entry['context'].update(context)
+
+    if entry['attempts'] >= MAX_ATTEMPTS:
+        entry['next_retry_at'] = None
+    else:
+        entry['next_retry_at'] = now + min(MAX_DELAY, BASE_DELAY * (2 ** (entry['attempts'] - 1)))
+
+    queue[url] = entry
+    return entry
+
+
+def record_success(queue, url):
+    """Drop a URL from the queue once it has been fetched successfully"""
+    return queue.pop(url, None) is not None
+
+
+def due_dead_letters(queue, kind=None, now=None):
+    """Entries whose backoff has elapsed, oldest schedule first"""
+    now = time.time() if now is None else now
+    due = [
+        entry for entry in queue.values()
+        if entry['next_retry_at'] is not None and entry['next_retry_at'] <= now
+        and (kind is None or entry['kind'] == kind)
+    ]
+    return sorted(due, key=lambda entry: entry['next_retry_at'])
+
+
+def next_retry_time(queue):
+    """Earliest scheduled retry (None if nothing is left to retry)"""
+    times = [entry['next_retry_at'] for entry in queue.values() if entry['next_retry_at'] is not None]
+    return min(times) if times else None
+
+
+def exhausted_dead_letters(queue):
+    """Entries that have used up all their attempts"""
+    return [entry for entry in queue.values() if entry['next_retry_at'] is None]
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import requests
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class HedgedFetcher:
+    """
+    Fetch pages with connect/read timeouts, an overall deadline and hedged duplicates
+
+    A request that is still running after the current p95 latency gets one
+    duplicate; whichever finishes first wins. Hedges are capped at
+    hedge_budget * requests so the extra load on the server stays bounded.
+
+    max_workers should leave room for a primary and a hedge per concurrent
+    caller; otherwise attempts wait in the pool while their deadline runs.
+    """
+
+    def __init__(self, connect_timeout=3.05, read_timeout=10, deadline=20,
+                 hedge_budget=0.1, min_hedge_delay=0.5, min_samples=20, window=500, max_workers=8):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+        self.hedge_budget = hedge_budget
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = threading.Lock()
+
+        # Rolling window that drives the hedge delay
+        self.recent = deque(maxlen=window)
+
+        # Totals for the tail-latency report
+        self.latencies = []
+        self.primary_latencies = []
+        self.requests_sent = 0
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self):
+        """Current hedge trigger: p95 of recent latencies, None until enough samples"""
+        with self.lock:
+            if len(self.recent) < self.min_samples:
+                return None
+            return max(self.min_hedge_delay, percentile(list(self.recent), 95))
+
+    def _reserve_hedge(self):
+        """Take one hedge from the budget if there is room"""
+        with self.lock:
+            if self.hedges_sent + 1 > self.hedge_budget * self.requests_sent:
+                return False
+            self.hedges_sent += 1
+            self.requests_sent += 1
+            return True
+
+    def _get(self, url, deadline_at, reader=None):
+        """Single GET bounded by the connect timeout and what is left of the deadline"""
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Deadline exceeded before request to {url}")
+
+        start = time.monotonic()
+        timeout = (self.connect_timeout, min(self.read_timeout, remaining))
+        if reader:
+            # Streamed: the reader consumes only as much of the body as it needs
+            result = reader(self.session.get(url, timeout=timeout, stream=True))
+        else:
+            result = self.session.get(url, timeout=timeout)
+            result.raise_for_status()
+        return result, time.monotonic() - start
+
+    def _record_primary(self, future, start, deadline_at):
+        """Keep the primary's own latency so the report can show what hedging saved"""
+        elapsed = time.monotonic() - start
+        if future.cancelled() or future.exception() is not None or elapsed > deadline_at - start:
+            # Failed or late primaries are exactly the tail hedging targets; count them at the deadline
+            elapsed = max(elapsed, deadline_at - start)
+        with self.lock:
+            self.primary_latencies.append(elapsed)
+
+    def fetch(self, url, deadline_at=None, reader=None):
+        """
+        Fetch a URL, hedging once if it runs past the current p95 latency
+
+        Args:
+            url: Page URL
+            deadline_at: time.monotonic() value by which the fetch must finish (optional)
+            reader: Callable that consumes a streamed response (optional)
+
+        Returns:
+            requests.Response of the first successful attempt, or the reader's result
+        """
+        start = time.monotonic()
+        if deadline_at is None:
+            deadline_at = start + self.deadline
+
+        with self.lock:
+            self.requests_sent += 1
+
+        primary = self.executor.submit(self._get, url, deadline_at, reader)
+        primary.add_done_callback(lambda future: self._record_primary(future, start, deadline_at))
+        pending = {primary}
+        hedge = None
+
+        delay = self.hedge_delay()
+        if delay is not None:
+            done, _ = wait(pending, timeout=min(delay, max(0, deadline_at - time.monotonic())))
+            if not done and self._reserve_hedge():
+                hedge = self.executor.submit(self._get, url, deadline_at, reader)
+                pending.add(hedge)
+
+        error = None
+        while pending:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+
+                latency = time.monotonic() - start
+                with self.lock:
+                    self.recent.append(latency)
+                    self.latencies.append(latency)
+                    if future is hedge:
+                        self.hedge_wins += 1
+                return future.result()[0]
+
+        # Failed fetches count at the deadline, matching the primary-only baseline
+        with self.lock:
+            self.latencies.append(max(time.monotonic() - start, deadline_at - start))
+        raise error or TimeoutError(f"Deadline of {deadline_at - start:.1f}s exceeded for {url}")
+
+    def report(self):
+        """Tail-latency summary for the run"""
+        with self.lock:
+            return {
+                'requests': self.requests_sent,
+                'hedges_sent': self.hedges_sent,
+                'hedge_wins': self.hedge_wins,
+                'p50': percentile(self.latencies, 50),
+                'p95': percentile(self.latencies, 95),
+                'p99': percentile(self.latencies, 99),
+                'primary_p95': percentile(self.primary_latencies, 95),
+                'primary_p99': percentile(self.primary_latencies, 99),
+            }
+
+    def print_report(self):
+        """Print the tail-latency summary"""
+        stats = self.report()
+        if not stats['p50']:
+            print("No successful requests to report latency for")
+            return
+
+        print(f"Requests sent: {stats['requests']} (hedges: {stats['hedges_sent']}, hedge wins: {stats['hedge_wins']})")
+        print(f"Page latency p50/p95/p99: {stats['p50']:.2f}s / {stats['p95']:.2f}s / {stats['p99']:.2f}s")
+        if stats['primary_p99']:
+            saved = stats['primary_p99'] - stats['p99']
+            print(f"Without hedging p95/p99: {stats['primary_p95']:.2f}s / {stats['primary_p99']:.2f}s "
+                  f"(p99 reduced by {saved:.2f}s)")
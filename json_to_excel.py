@@ -1,8 +1,12 @@
 import json
+import os
+import re
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from normalize_schools import normalize_schools
 
-def json_to_excel(json_file, excel_file=None, sheet_name='Schools'):
+def json_to_excel(json_file, excel_file=None, sheet_name='Schools', normalize=False):
     """
     Convert JSON file to Excel format
     
@@ -10,6 +14,7 @@ def json_to_excel(json_file, excel_file=None, sheet_name='Schools'):
         json_file: Path to input JSON file
         excel_file: Path to output Excel file (optional)
         sheet_name: Name of the Excel sheet
+        normalize: Clean and validate records before writing (see normalize_schools.py)
     """
     try:
         # Read JSON file
@@ -22,6 +27,10 @@ def json_to_excel(json_file, excel_file=None, sheet_name='Schools'):
         # Convert to DataFrame
         df = pd.DataFrame(data)
         
+        if normalize:
+            df = normalize_schools(df)
+            print(f"✓ Normalized records ({int((~df['is_valid']).sum())} flagged invalid)")
+        
         # Generate output filename if not provided
         if not excel_file:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -48,6 +57,132 @@ def json_to_excel(json_file, excel_file=None, sheet_name='Schools'):
         print(f"✗ Error converting JSON to Excel: {e}")
         return None
 
+def district_file_name(district):
+    """Turn a district name into a safe workbook file name"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(district)).strip('_') or 'Unknown'
+
+def write_district_workbook(district, records, excel_file, sheet_name='Schools'):
+    """Write one district's records to its own workbook (runs inside a worker process)"""
+    df = pd.DataFrame(records)
+    df.to_excel(excel_file, sheet_name=sheet_name, index=False, engine='openpyxl')
+    return district, len(df)
+
+def build_summary_tables(df):
+    """
+    Precompute the summary tables for the summary workbook
+    
+    Args:
+        df: DataFrame with all school records
+    
+    Returns:
+        Dict of sheet name -> DataFrame
+    """
+    district = df['school_district'].fillna('Unknown') if 'school_district' in df.columns else pd.Series('Unknown', index=df.index)
+    
+    # A school counts as completed once its detail page has been merged in
+    completed = pd.Series(False, index=df.index)
+    for column in ('affiliate_id', 'affiliation_id'):
+        if column in df.columns:
+            completed |= df[column].notna()
+    
+    by_district = pd.DataFrame({'district': district, 'completed': completed}).groupby('district')['completed'].agg(
+        total='size', completed='sum'
+    )
+    by_district['completion_pct'] = (by_district['completed'] / by_district['total'] * 100).round(1)
+    by_district = by_district.sort_values('total', ascending=False).reset_index()
+    
+    status = df['school_status'].fillna('Unknown') if 'school_status' in df.columns else pd.Series('Unknown', index=df.index)
+    by_status = status.value_counts().rename_axis('school_status').reset_index(name='schools')
+    
+    year = pd.to_numeric(df['foundation_year'], errors='coerce') if 'foundation_year' in df.columns else pd.Series(float('nan'), index=df.index)
+    decade = (year // 10 * 10).astype('Int64').astype('string').fillna('Unknown')
+    decade = decade.where(decade == 'Unknown', decade + 's')
+    by_decade = decade.value_counts().sort_index().rename_axis('foundation_decade').reset_index(name='schools')
+    
+    overall = pd.DataFrame([{
+        'total_schools': len(df),
+        'completed': int(completed.sum()),
+        'completion_pct': round(completed.mean() * 100, 1) if len(df) else 0,
+        'districts': district.nunique(),
+    }])
+    
+    return {
+        'Overview': overall,
+        'By District': by_district,
+        'By Status': by_status,
+        'By Foundation Decade': by_decade,
+    }
+
+def json_to_excel_by_district(json_file, output_dir=None, max_workers=None, normalize=False):
+    """
+    Export one workbook per district in parallel, plus a summary workbook
+    
+    Args:
+        json_file: Path to input JSON file
+        output_dir: Directory for the workbooks (optional)
+        max_workers: Number of worker processes (default: number of CPUs)
+        normalize: Clean and validate records before writing (see normalize_schools.py)
+    """
+    try:
+        print(f"Reading JSON file: {json_file}")
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        print(f"✓ Loaded {len(data)} records")
+        
+        df = pd.DataFrame(data)
+        
+        if normalize:
+            df = normalize_schools(df)
+            print(f"✓ Normalized records ({int((~df['is_valid']).sum())} flagged invalid)")
+        
+        if 'school_district' not in df.columns:
+            df['school_district'] = 'Unknown'
+        
+        # Generate output directory if not provided
+        if not output_dir:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            output_dir = json_file.replace('.json', f'_by_district_{timestamp}')
+        os.makedirs(output_dir, exist_ok=True)
+        
+        start_time = datetime.now()
+        
+        # Shard by district; each shard is written by a separate process
+        shards = df.groupby(df['school_district'].fillna('Unknown'), sort=False)
+        print(f"Writing {shards.ngroups} district workbooks to: {output_dir}")
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            for district, shard in shards:
+                excel_file = os.path.join(output_dir, f"{district_file_name(district)}.xlsx")
+                records = shard.dropna(axis=1, how='all').to_dict('records')
+                futures.append(executor.submit(write_district_workbook, district, records, excel_file))
+            
+            written = 0
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    written += 1
+                except Exception as e:
+                    print(f"✗ Error writing district workbook: {e}")
+        
+        # Summary workbook, one sheet per precomputed table
+        summary_file = os.path.join(output_dir, 'Summary.xlsx')
+        with pd.ExcelWriter(summary_file, engine='openpyxl') as writer:
+            for sheet, table in build_summary_tables(df).items():
+                table.to_excel(writer, sheet_name=sheet, index=False)
+        
+        duration = (datetime.now() - start_time).total_seconds()
+        
+        print(f"✓ Wrote {written}/{shards.ngroups} district workbooks in {duration:.2f} seconds")
+        print(f"✓ Summary workbook: {summary_file}")
+        
+        return output_dir
+        
+    except Exception as e:
+        print(f"✗ Error exporting district workbooks: {e}")
+        return None
+
 def main():
     print("="*70)
     print("JSON TO EXCEL CONVERTER")
@@ -58,20 +193,34 @@ def main():
     if not json_file:
         json_file = 'progress_checkpoint.json'
     
-    # Ask for output file
-    excel_file = input("Enter Excel file name (press Enter for auto-generated): ").strip()
-    if not excel_file:
-        excel_file = None
+    # Ask for export mode
+    by_district = input("Export one workbook per district with a summary? (yes/no, default: no): ").strip().lower() == 'yes'
+    
+    if by_district:
+        output_dir = input("Enter output directory (press Enter for auto-generated): ").strip()
+        if not output_dir:
+            output_dir = None
+    else:
+        # Ask for output file
+        excel_file = input("Enter Excel file name (press Enter for auto-generated): ").strip()
+        if not excel_file:
+            excel_file = None
+        
+        # Ask for sheet name
+        sheet_name = input("Enter sheet name (default: Schools): ").strip()
+        if not sheet_name:
+            sheet_name = 'Schools'
     
-    # Ask for sheet name
-    sheet_name = input("Enter sheet name (default: Schools): ").strip()
-    if not sheet_name:
-        sheet_name = 'Schools'
+    # Ask whether to normalize
+    normalize = input("Normalize and validate records first? (yes/no, default: no): ").strip().lower() == 'yes'
     
     print("\n" + "="*70)
     
     # Convert
-    result = json_to_excel(json_file, excel_file, sheet_name)
+    if by_district:
+        result = json_to_excel_by_district(json_file, output_dir, normalize=normalize)
+    else:
+        result = json_to_excel(json_file, excel_file, sheet_name, normalize)
     
     if result:
         print("\n" + "="*70)
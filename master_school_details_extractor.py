@@ -1,9 +1,13 @@
 from bs4 import BeautifulSoup
 import json
-import requests
 import time
 from datetime import datetime
 import os
+from pincode_index import enrich_school
+from hedged_fetch import HedgedFetcher
+from streaming_fetch import read_detail_fragment, print_transfer_report
+from run_stats import RunStats, load_stats, save_stats, clear_stats, schools_fingerprint
+from dead_letter_queue import load_dead_letters, save_dead_letters, record_failure, record_success, due_dead_letters
 
 def extract_school_details_from_html(html_content):
     """Extract detailed school information from school detail page"""
@@ -45,22 +49,40 @@ def extract_school_details_from_html(html_content):
     
     return school_data
 
-def fetch_school_details(url, retry_count=3):
-    """Fetch school detail page and extract information with retry logic"""
+# Shared fetcher: separate connect/read timeouts, per-URL deadline, hedged duplicates
+fetcher = HedgedFetcher(connect_timeout=3.05, read_timeout=10, deadline=20, hedge_budget=0.1)
+
+def fetch_school_details(url, retry_count=1, dead_letters=None, http=None, verbose=True):
+    """Fetch school detail page and extract information, deferring failures to the dead-letter queue"""
+    http = http or fetcher
+    # All attempts share one deadline, started when this fetch begins, so a slow page cannot stall the run
+    deadline_at = time.monotonic() + http.deadline
+    
     for attempt in range(retry_count):
         try:
-            response = requests.get(url, timeout=15)
-            response.raise_for_status()
+            # Stops downloading once the schooldetails table has arrived
+            html_content = http.fetch(url, deadline_at, reader=read_detail_fragment)
             
-            school_details = extract_school_details_from_html(response.text)
+            school_details = extract_school_details_from_html(html_content)
+            
+            if dead_letters is not None:
+                if school_details:
+                    record_success(dead_letters, url)
+                else:
+                    record_failure(dead_letters, url, 'detail', 'No school details table found')
             return school_details
             
         except Exception as e:
-            if attempt < retry_count - 1:
-                time.sleep(2)  # Wait before retry
+            backoff = 0.5 * (2 ** attempt)
+            if attempt < retry_count - 1 and time.monotonic() + backoff < deadline_at:
+                time.sleep(backoff)  # Wait before retry
                 continue
             else:
-                print(f"    ✗ Failed after {retry_count} attempts: {e}")
+                if verbose:
+                    print(f"    ✗ Failed after {attempt + 1} attempts: {e}")
+                # Retried in a later pass instead of blocking the run
+                if dead_letters is not None:
+                    record_failure(dead_letters, url, 'detail', e)
                 return None
 
 def load_schools_data(file_path='SchoolsData.json'):
@@ -94,6 +116,29 @@ def save_progress(schools, progress_file='progress_checkpoint.json'):
     except:
         return False
 
+def retry_due_details(dead_letters, schools_by_link, stats=None, recovered_links=None):
+    """Retry detail pages whose backoff has elapsed and merge any recovered details"""
+    recovered = 0
+    
+    for entry in due_dead_letters(dead_letters, kind='detail'):
+        school = schools_by_link.get(entry['url'])
+        if school is None:
+            continue  # Not part of this run; left for retry-failed.py
+        
+        print(f"  ↻ Retrying (attempt {entry['attempts'] + 1}): {entry['url']}")
+        details = fetch_school_details(entry['url'], dead_letters=dead_letters)
+        
+        if details:
+            school.update(details)
+            enrich_school(school)
+            recovered += 1
+            if recovered_links is not None:
+                recovered_links.add(entry['url'])
+            if stats:
+                stats.record_success(school.get('school_district', 'Unknown'), entry['url'])
+    
+    return recovered
+
 def main():
     print("="*80)
     print("MASTER SCHOOL DETAILS EXTRACTOR")
@@ -119,25 +164,59 @@ def main():
     
     save_interval = 1
     
+    # Failed pages whose backoff has elapsed are retried every this many fetches
+    retry_interval = 50
+    
     print("\n" + "="*80)
     print(f"Starting extraction from index {start_idx} to {end_idx}")
     print(f"Delay between requests: {delay} seconds")
     print(f"Progress checkpoint every: {save_interval} schools")
     print("="*80 + "\n")
     
+    dead_letters = load_dead_letters()
+    
+    # Resume the school list and its statistics together from an unfinished run's checkpoint;
+    # otherwise build fresh statistics for the loaded list
+    source_file = 'SchoolsData.json'
+    fingerprint = schools_fingerprint(schools)
+    stats = load_stats()
+    checkpoint = None
+    if stats and stats.matches(source_file, fingerprint) and os.path.exists('progress_checkpoint.json'):
+        checkpoint = load_schools_data('progress_checkpoint.json')
+    
+    if checkpoint and schools_fingerprint(checkpoint) == fingerprint:
+        schools = checkpoint
+        print(f"✓ Resumed from checkpoint: {stats.completed}/{stats.total} schools completed")
+    else:
+        stats = RunStats(source=source_file, fingerprint=fingerprint)
+        for school in schools:
+            stats.add_school(school.get('school_district', 'Unknown'), 'affiliate_id' in school or 'affiliation_id' in school)
+    
+    schools_by_link = {school.get('school_link'): school for school in schools if school.get('school_link')}
+    
     start_time = datetime.now()
     
     # Process each school
     success_count = 0
     fail_count = 0
     already_processed = 0
+    fetched_count = 0
+    recovered_count = 0
+    # Schools recovered by a deferred retry before the loop reached them
+    recovered_links = set()
     
     for idx in range(start_idx, min(end_idx, len(schools))):
         school = schools[idx]
         
+        # Already counted as recovered, so not as already processed too
+        if school.get('school_link') in recovered_links:
+            print(f"[{idx+1}/{len(schools)}] Skipping {school.get('school_name', 'Unknown')} - Recovered on deferred retry")
+            continue
+        
         # Check if already processed (has detailed fields)
         if 'affiliate_id' in school or 'affiliation_id' in school:
             already_processed += 1
+            stats.record_skip()
             print(f"[{idx+1}/{len(schools)}] Skipping {school.get('school_name', 'Unknown')} - Already processed")
             continue
         
@@ -147,6 +226,7 @@ def main():
         
         if not school_link:
             fail_count += 1
+            stats.record_failure(school_district, f"{school_district}/{school_name}", fetched=False)
             print(f"[{idx+1}/{len(schools)}] ✗ Skipping {school_name} - No link available")
             continue
         
@@ -155,29 +235,54 @@ def main():
         print(f"  Link: {school_link}")
         
         # Fetch detailed information
-        details = fetch_school_details(school_link)
+        details = fetch_school_details(school_link, dead_letters=dead_letters)
         
         if details:
             # Merge detailed information into school data
             school.update(details)
+            # Add state, postal circle and region from the offline pin-code index
+            enrich_school(school)
             success_count += 1
+            stats.record_success(school_district, school_link)
             print(f"  ✓ Successfully extracted {len(details)} additional fields")
         else:
             fail_count += 1
+            stats.record_failure(school_district, school_link)
             print(f"  ✗ Failed to extract details")
         
+        # Deferred retries run between batches so healthy work keeps flowing
+        fetched_count += 1
+        if fetched_count % retry_interval == 0:
+            recovered_count += retry_due_details(dead_letters, schools_by_link, stats, recovered_links)
+        
+        # Live status file, rewritten at most every 10 seconds
+        stats.flush_status()
+        
         # Save progress at intervals
         if (idx + 1 - start_idx) % save_interval == 0:
             save_progress(schools, 'progress_checkpoint.json')
+            save_dead_letters(dead_letters)
+            save_stats(stats)
             print(f"\n>>> Progress checkpoint saved: {idx + 1} schools processed")
-            print(f">>> Success: {success_count} | Failed: {fail_count} | Already processed: {already_processed}\n")
+            print(f">>> Success: {success_count} | Failed: {fail_count} | Already processed: {already_processed}")
+            eta = stats.eta_seconds()
+            eta_text = f"{eta/60:.1f} minutes" if eta is not None else "unknown"
+            print(f">>> Completed: {stats.completed}/{stats.total} ({stats.completion_pct():.1f}%) | "
+                  f"{stats.pages_per_second():.2f} pages/sec | ETA: {eta_text}\n")
         
         # Delay between requests
         time.sleep(delay)
     
+    # Last pass over failed pages that are due by now
+    recovered_count += retry_due_details(dead_letters, schools_by_link, stats, recovered_links)
+    
     # Final save
     output_file = 'SchoolsData_Complete.json'
     save_schools_data(schools, output_file)
+    save_dead_letters(dead_letters)
+    stats.flush_status(force=True)
+    # The run is finished, so the next run starts from fresh statistics
+    clear_stats()
     
     # Summary
     end_time = datetime.now()
@@ -190,10 +295,18 @@ def main():
     print(f"Successfully extracted details: {success_count}")
     print(f"Failed extractions: {fail_count}")
     print(f"Already processed: {already_processed}")
+    print(f"Recovered on deferred retry: {recovered_count}")
     print(f"Time taken: {duration:.2f} seconds ({duration/60:.2f} minutes)")
     print(f"Output file: {output_file}")
+    if dead_letters:
+        print(f"Deferred to dead-letter queue: {len(dead_letters)} (run retry-failed.py)")
     print("="*80)
     
+    # Tail latency
+    print("\nREQUEST LATENCY:")
+    fetcher.print_report()
+    print_transfer_report()
+    
     # Sample data
     if success_count > 0:
         print("\nSample of complete data (first school with details):")
@@ -208,28 +321,15 @@ def main():
                     print(f"  ... and {len(school) - 15} more fields")
                 break
     
-    # District-wise completion summary
-    district_stats = {}
-    for school in schools:
-        district = school.get('school_district', 'Unknown')
-        has_details = 'affiliate_id' in school or 'affiliation_id' in school
-        
-        if district not in district_stats:
-            district_stats[district] = {'total': 0, 'completed': 0}
-        
-        district_stats[district]['total'] += 1
-        if has_details:
-            district_stats[district]['completed'] += 1
-    
+    # District-wise completion summary (maintained incrementally during the run)
     print("\n" + "="*80)
     print("DISTRICT-WISE COMPLETION STATUS:")
     print("="*80)
-    for district, stats in sorted(district_stats.items(), key=lambda x: x[1]['completed'], reverse=True)[:20]:
-        completion_pct = (stats['completed'] / stats['total'] * 100) if stats['total'] > 0 else 0
-        print(f"{district}: {stats['completed']}/{stats['total']} ({completion_pct:.1f}%)")
+    for district, total, completed, completion_pct in stats.district_summary('completed', 20):
+        print(f"{district}: {completed}/{total} ({completion_pct:.1f}%)")
     
-    if len(district_stats) > 20:
-        print(f"... and {len(district_stats) - 20} more districts")
+    if len(stats.districts) > 20:
+        print(f"... and {len(stats.districts) - 20} more districts")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,182 @@
+import json
+import time
+import pandas as pd
+from datetime import datetime
+
+# Free-text columns whose embedded "\n\t\t" runs get collapsed to single spaces
+TEXT_COLUMNS = [
+    'school_name', 'school_description', 'school_district', 'name', 'address',
+    'principal_head_of_institution', 'school_status', 'managing_trust_society_committee',
+]
+
+PHONE_COLUMNS = ['office_phone', 'residence_phone', 'fax']
+
+COUNTRY_CODE = '91'
+MIN_FOUNDATION_YEAR = 1800
+
+
+def collapse_whitespace(series):
+    """Collapse whitespace runs and trim a string column (missing values stay missing)"""
+    return series.astype('string').str.replace(r'\s+', ' ', regex=True).str.strip().replace('', pd.NA)
+
+
+def digits_only(series):
+    """Strip everything except digits from a column (numbers read back from Excel lose their '.0')"""
+    cleaned = series.astype('string').str.replace(r'\.0$', '', regex=True)
+    return cleaned.str.replace(r'\D', '', regex=True).replace('', pd.NA)
+
+
+def build_e164(phone, std_code=None):
+    """
+    Build E.164 phone numbers from a phone column and an optional STD code column
+
+    Args:
+        phone: Series with the raw phone numbers
+        std_code: Series with the raw STD (area) codes, aligned with phone
+
+    Returns:
+        Series of '+91...' strings, missing where no valid number can be built
+    """
+    digits = digits_only(phone)
+
+    # Drop the trunk prefix ("0562..." / "091...") so only the national number remains
+    national = digits.str.replace(r'^(?:0091|91(?=\d{10}$)|0)', '', regex=True)
+
+    if std_code is not None:
+        std = digits_only(std_code).str.lstrip('0')
+        # Landlines that are stored without their area code get it prepended
+        short = national.str.len() < 10
+        national = national.mask(short & std.notna(), std + national)
+
+    valid = national.str.fullmatch(r'[1-9]\d{9}').fillna(False).astype(bool)
+    return ('+' + COUNTRY_CODE + national).where(valid, pd.NA)
+
+
+def normalize_schools(df):
+    """
+    Normalize and validate an extracted schools DataFrame with column-wise operations
+
+    Args:
+        df: DataFrame built from the extracted school records
+
+    Returns:
+        New DataFrame with cleaned columns plus 'is_valid' and 'validation_errors'
+    """
+    df = df.copy()
+    errors = pd.DataFrame(index=df.index)
+
+    for column in TEXT_COLUMNS:
+        if column in df.columns:
+            df[column] = collapse_whitespace(df[column])
+
+    if 'e-mail' in df.columns:
+        email = collapse_whitespace(df['e-mail']).str.lower()
+        df['e-mail'] = email
+        errors['invalid_email'] = email.notna() & ~email.str.fullmatch(r'[^@\s]+@[^@\s]+\.[a-z]{2,}').fillna(False)
+
+    if 'website' in df.columns:
+        df['website'] = collapse_whitespace(df['website']).str.lower()
+
+    std_code = df['std_code'] if 'std_code' in df.columns else None
+    for column in PHONE_COLUMNS:
+        if column in df.columns:
+            df[f'{column}_e164'] = build_e164(df[column], std_code)
+    if 'office_phone' in df.columns:
+        errors['invalid_phone'] = digits_only(df['office_phone']).notna() & df['office_phone_e164'].isna()
+
+    if 'pin_code' in df.columns:
+        pin_code = digits_only(df['pin_code'])
+        valid_pin = pin_code.str.fullmatch(r'[1-9]\d{5}').fillna(False).astype(bool)
+        df['pin_code'] = pin_code.where(valid_pin, pd.NA)
+        errors['invalid_pin_code'] = pin_code.notna() & ~valid_pin
+
+    if 'foundation_year' in df.columns:
+        year = pd.to_numeric(digits_only(df['foundation_year']), errors='coerce')
+        valid_year = year.between(MIN_FOUNDATION_YEAR, datetime.now().year)
+        df['foundation_year'] = year.where(valid_year).astype('Int64')
+        errors['invalid_foundation_year'] = year.notna() & ~valid_year
+
+    if 'affiliate_id' in df.columns:
+        df['affiliate_id'] = digits_only(df['affiliate_id'])
+
+    # Join the per-column labels into a readable "a, b" string per row
+    errors = errors.fillna(False).astype(bool)
+    joined = pd.Series('', index=df.index, dtype='string')
+    for label in errors.columns:
+        joined += pd.Series(f'{label}, ', index=df.index, dtype='string').where(errors[label], '')
+    df['validation_errors'] = joined.str.rstrip(', ')
+    df['is_valid'] = ~errors.any(axis=1)
+
+    return df
+
+
+def normalize_json(json_file, output_file=None):
+    """
+    Normalize a JSON file of extracted schools and save the cleaned records
+
+    Args:
+        json_file: Path to input JSON file (e.g. SchoolsData_Complete.json)
+        output_file: Path to output JSON file (optional)
+
+    Returns:
+        Path of the normalized JSON file, or None on failure
+    """
+    try:
+        print(f"Reading JSON file: {json_file}")
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        print(f"✓ Loaded {len(data)} records")
+
+        start = time.perf_counter()
+        df = normalize_schools(pd.DataFrame(data))
+        duration = time.perf_counter() - start
+
+        if not output_file:
+            output_file = json_file.replace('.json', '_Normalized.json')
+
+        # to_json keeps missing values as null and Int64 years as plain integers
+        df.to_json(output_file, orient='records', indent=2, force_ascii=False)
+
+        invalid = int((~df['is_valid']).sum())
+        rate = len(df) / duration if duration > 0 else float('inf')
+
+        print(f"✓ Normalized {len(df)} rows in {duration:.3f} seconds ({rate:,.0f} rows/second)")
+        print(f"✓ Rows flagged invalid: {invalid}")
+        print(f"✓ Output file: {output_file}")
+
+        return output_file
+
+    except Exception as e:
+        print(f"✗ Error normalizing data: {e}")
+        return None
+
+
+def main():
+    print("="*70)
+    print("SCHOOLS DATA NORMALIZER")
+    print("="*70)
+
+    json_file = input("\nEnter JSON file name (default: SchoolsData_Complete.json): ").strip()
+    if not json_file:
+        json_file = 'SchoolsData_Complete.json'
+
+    output_file = input("Enter output file name (press Enter for auto-generated): ").strip()
+    if not output_file:
+        output_file = None
+
+    print("\n" + "="*70)
+
+    result = normalize_json(json_file, output_file)
+
+    if result:
+        print("\n" + "="*70)
+        print("NORMALIZATION COMPLETE!")
+        print("Next step: convert the normalized file with json_to_excel.py")
+        print("="*70)
+    else:
+        print("\nNormalization failed!")
+
+
+if __name__ == "__main__":
+    main()
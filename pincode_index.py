@@ -0,0 +1,200 @@
+import csv
+import json
+import os
+import threading
+import time
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Bundled reference data: inclusive pin ranges mapped to state, postal circle and region.
+# Most rows span a whole state's block of sorting districts; where a sorting district
+# (first 3 digits) crosses a state line it is split down to the pin codes involved
+PINCODE_CSV = os.path.join(BASE_DIR, 'pincode_ranges.csv')
+
+# Compiled index: one sorted .npy array per column plus a label table
+INDEX_PREFIX = os.path.join(BASE_DIR, 'pincode_index')
+INDEX_COLUMNS = ('start', 'end', 'label')
+LABELS_FILE = os.path.join(BASE_DIR, 'pincode_index.json')
+
+INDEX_DTYPE = np.dtype([('start', '<u4'), ('end', '<u4'), ('label', '<u2')])
+
+_index = {}
+_index_lock = threading.Lock()
+
+
+def build_pincode_index(csv_file=PINCODE_CSV, index_prefix=INDEX_PREFIX, labels_file=LABELS_FILE):
+    """
+    Compile the pin-code reference CSV into a sorted, memory-mappable index
+
+    Args:
+        csv_file: Path to the reference CSV (pin_start, pin_end, state, postal_circle, region)
+        index_prefix: Path prefix of the per-column .npy files
+        labels_file: Path to the output label table
+
+    Returns:
+        Number of ranges in the index
+    """
+    with open(csv_file, 'r', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+
+    labels = []
+    label_ids = {}
+    table = np.empty(len(rows), dtype=INDEX_DTYPE)
+
+    for i, row in enumerate(rows):
+        label = (row['state'], row['postal_circle'], row['region'])
+        if label not in label_ids:
+            label_ids[label] = len(labels)
+            labels.append(label)
+        table[i] = (int(row['pin_start']), int(row['pin_end']), label_ids[label])
+
+    table.sort(order='start')
+
+    # Lookups assume disjoint ranges, so reject overlapping reference rows up front
+    overlaps = np.nonzero(table['start'][1:] <= table['end'][:-1])[0]
+    if len(overlaps):
+        first = table[overlaps[0] + 1]
+        raise ValueError(f"Overlapping pin-code ranges at {first['start']}")
+
+    # Separate contiguous arrays so each column can be memory-mapped directly
+    for column in INDEX_COLUMNS:
+        np.save(f'{index_prefix}_{column}.npy', np.ascontiguousarray(table[column]))
+    with open(labels_file, 'w', encoding='utf-8') as file:
+        json.dump(labels, file, indent=2, ensure_ascii=False)
+
+    return len(table)
+
+
+def load_pincode_index(index_prefix=INDEX_PREFIX, labels_file=LABELS_FILE):
+    """Load (and build if missing or stale) the memory-mapped pin-code index"""
+    if 'labels' in _index:
+        return _index
+
+    # Detail workers enrich schools concurrently: only one thread builds and loads,
+    # and the others see either no index or a complete one
+    with _index_lock:
+        if 'labels' in _index:
+            return _index
+
+        files = [f'{index_prefix}_{column}.npy' for column in INDEX_COLUMNS]
+        if not all(os.path.exists(f) for f in files) or min(os.path.getmtime(f) for f in files) < os.path.getmtime(PINCODE_CSV):
+            build_pincode_index(index_prefix=index_prefix, labels_file=labels_file)
+
+        # Each column is mapped straight from disk; nothing is copied into RAM
+        index = dict(zip(('starts', 'ends', 'label_ids'), (np.load(f, mmap_mode='r') for f in files)))
+        with open(labels_file, 'r', encoding='utf-8') as file:
+            # 'labels' goes in last: its presence is what marks the index as ready
+            index['labels'] = [tuple(label) for label in json.load(file)]
+
+        _index.update(index)
+
+    return _index
+
+
+def lookup_pincode(pin_code):
+    """
+    Look up state, postal circle and region for a single pin code
+
+    Args:
+        pin_code: Pin code as str or int (e.g. '283126')
+
+    Returns:
+        Dict with state, postal_circle and region, or None if unknown
+    """
+    try:
+        pin = int(str(pin_code).strip().split('.')[0])
+    except (TypeError, ValueError):
+        return None
+
+    load_pincode_index()
+    starts = _index['starts']
+
+    pos = int(np.searchsorted(starts, pin, side='right')) - 1
+    if pos < 0 or pin > _index['ends'][pos]:
+        return None
+
+    state, postal_circle, region = _index['labels'][_index['label_ids'][pos]]
+    return {'state': state, 'postal_circle': postal_circle, 'region': region}
+
+
+def lookup_pincodes(pin_codes):
+    """
+    Vectorized lookup for many pin codes at once
+
+    Args:
+        pin_codes: Iterable of pin codes (str/int, missing values allowed)
+
+    Returns:
+        List of dicts (or None for unknown pin codes), aligned with the input
+    """
+    load_pincode_index()
+    starts = _index['starts']
+
+    pins = np.array([int(p) if str(p).isdigit() else -1 for p in pin_codes], dtype=np.int64)
+    pos = np.searchsorted(starts, pins, side='right') - 1
+    found = (pos >= 0) & (pins >= 0)
+    found[found] &= pins[found] <= _index['ends'][pos[found]]
+
+    labels = _index['labels']
+    label_ids = _index['label_ids']
+    results = []
+    for i in range(len(pins)):
+        if found[i]:
+            state, postal_circle, region = labels[label_ids[pos[i]]]
+            results.append({'state': state, 'postal_circle': postal_circle, 'region': region})
+        else:
+            results.append(None)
+    return results
+
+
+def enrich_school(school):
+    """Add state, postal_circle and region to a school record from its pin code"""
+    location = lookup_pincode(school.get('pin_code', ''))
+    if location:
+        school.update(location)
+    return school
+
+
+def benchmark(lookups=100000):
+    """Measure index build time and single/batch lookup throughput"""
+    start = time.perf_counter()
+    ranges = build_pincode_index()
+    build_time = time.perf_counter() - start
+
+    _index.clear()
+    load_pincode_index()
+
+    rng = np.random.default_rng(0)
+    pins = rng.integers(100000, 999999, size=lookups).tolist()
+
+    start = time.perf_counter()
+    for pin in pins:
+        lookup_pincode(pin)
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lookup_pincodes(pins)
+    batch_time = time.perf_counter() - start
+
+    print(f"Index build: {ranges} ranges in {build_time * 1000:.2f} ms")
+    print(f"Single lookups: {single_time / lookups * 1e6:.2f} µs/lookup ({lookups / single_time:,.0f} lookups/second)")
+    print(f"Batch lookups: {batch_time / lookups * 1e6:.2f} µs/lookup ({lookups / batch_time:,.0f} lookups/second)")
+
+
+def main():
+    print("="*70)
+    print("PIN CODE REFERENCE INDEX")
+    print("="*70)
+
+    ranges = build_pincode_index()
+    print(f"✓ Built index with {ranges} ranges: {INDEX_PREFIX}_*.npy")
+
+    print("\n" + "="*70)
+    print("BENCHMARK")
+    print("="*70)
+    benchmark()
+
+
+if __name__ == "__main__":
+    main()
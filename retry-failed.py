@@ -0,0 +1,162 @@
+import json
+import os
+import time
+from datetime import datetime
+from dead_letter_queue import (
+    load_dead_letters, save_dead_letters, due_dead_letters, next_retry_time, exhausted_dead_letters
+)
+from bulk_school_extractor import scrape_schools_from_district
+from master_school_details_extractor import fetch_school_details
+from pincode_index import enrich_school
+
+LISTINGS_FILE = 'SchoolsData.json'
+DETAILS_FILE = 'SchoolsData_Complete.json'
+
+# Longest we are willing to wait for the next scheduled retry before stopping
+MAX_WAIT = 600
+
+
+def load_json(file_path, default):
+    """Load JSON file, falling back to default if missing"""
+    if not os.path.exists(file_path):
+        return default
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_json(data, file_path):
+    """Save data to JSON file"""
+    with open(file_path, 'w', encoding='utf-8') as json_file:
+        json.dump(data, json_file, indent=2, ensure_ascii=False)
+
+
+def retry_listing(entry, dead_letters, listings):
+    """Retry a district listing page and add any new schools to the listings"""
+    context = entry.get('context', {})
+    schools = scrape_schools_from_district(
+        entry['url'],
+        context.get('district', 'Unknown'),
+        dead_letters,
+        follow_pagination=context.get('follow_pagination', False),
+    )
+
+    known_links = {school.get('school_link') for school in listings}
+    new_schools = [school for school in schools if school.get('school_link') not in known_links]
+    listings.extend(new_schools)
+    return len(new_schools)
+
+
+def retry_detail(entry, dead_letters, details_list, schools_by_link):
+    """Retry a school detail page and merge the details into its record"""
+    details = fetch_school_details(entry['url'], dead_letters=dead_letters)
+    if not details:
+        return False
+
+    school = schools_by_link.get(entry['url'])
+    if school is None:
+        # Not in the data file yet: keep the details as a new record instead of dropping them
+        school = {'school_link': entry['url']}
+        details_list.append(school)
+        schools_by_link[entry['url']] = school
+
+    school.update(details)
+    enrich_school(school)
+    return True
+
+
+def run_pass(dead_letters, listings, details, schools_by_link):
+    """Retry every entry that is due; returns (succeeded, failed)"""
+    succeeded = 0
+    failed = 0
+
+    for entry in due_dead_letters(dead_letters):
+        url = entry['url']
+        print(f"\n[{entry['kind']}] Attempt {entry['attempts'] + 1}: {url}")
+        print(f"  Last failure: {entry.get('reason', '')}")
+
+        if entry['kind'] == 'listing':
+            added = retry_listing(entry, dead_letters, listings)
+            print(f"  Added {added} new schools")
+        else:
+            retry_detail(entry, dead_letters, details, schools_by_link)
+
+        if url in dead_letters:
+            failed += 1
+            print("  ✗ Still failing, rescheduled")
+        else:
+            succeeded += 1
+            print("  ✓ Recovered")
+
+    return succeeded, failed
+
+
+def main():
+    print("="*80)
+    print("RETRY FAILED - Dead-letter queue processor")
+    print("="*80)
+
+    dead_letters = load_dead_letters()
+    if not dead_letters:
+        print("Dead-letter queue is empty. Nothing to retry.")
+        return
+
+    print(f"Entries in queue: {len(dead_letters)}")
+
+    listings = load_json(LISTINGS_FILE, [])
+    details = load_json(DETAILS_FILE, None) or load_json('progress_checkpoint.json', None) or listings
+    schools_by_link = {school.get('school_link'): school for school in details}
+
+    start_time = datetime.now()
+    pass_num = 0
+    total_succeeded = 0
+
+    # Keep making passes while retries are scheduled within MAX_WAIT
+    while True:
+        next_time = next_retry_time(dead_letters)
+        if next_time is None:
+            break
+
+        wait_time = next_time - time.time()
+        if wait_time > MAX_WAIT:
+            print(f"\nNext retry is in {wait_time/60:.1f} minutes. Run retry-failed.py again later.")
+            break
+        if wait_time > 0:
+            print(f"\nWaiting {wait_time:.0f} seconds for the next scheduled retry...")
+            time.sleep(wait_time)
+
+        pass_num += 1
+        print(f"\n>>> Pass {pass_num}")
+        succeeded, failed = run_pass(dead_letters, listings, details, schools_by_link)
+        total_succeeded += succeeded
+
+        # Persist after every pass so an interrupted run loses nothing
+        save_dead_letters(dead_letters)
+        save_json(listings, LISTINGS_FILE)
+        if details is not listings:
+            save_json(details, DETAILS_FILE)
+        print(f">>> Pass {pass_num} done: {succeeded} recovered, {failed} still failing")
+
+    duration = (datetime.now() - start_time).total_seconds()
+    exhausted = exhausted_dead_letters(dead_letters)
+
+    print("\n" + "="*80)
+    print("RETRY COMPLETE!")
+    print("="*80)
+    print(f"Passes: {pass_num}")
+    print(f"Recovered: {total_succeeded}")
+    print(f"Still scheduled: {len(dead_letters) - len(exhausted)}")
+    print(f"Permanently failed: {len(exhausted)}")
+    print(f"Time taken: {duration:.2f} seconds ({duration/60:.2f} minutes)")
+    print("="*80)
+
+    if dead_letters:
+        print("\nFINAL FAILURE SET:")
+        print("="*80)
+        for entry in sorted(dead_letters.values(), key=lambda entry: entry['attempts'], reverse=True):
+            status = 'gave up' if entry['next_retry_at'] is None else 'scheduled'
+            print(f"[{entry['kind']}] {entry['url']}")
+            print(f"  Attempts: {entry['attempts']} ({status}) | Reason: {entry.get('reason', '')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+STATS_FILE = 'progress_checkpoint_stats.json'
+STATUS_FILE = 'run_status.json'
+
+
+class RunStats:
+    """
+    Run statistics updated in O(1) per processed record
+
+    Keeps per-district totals and completions, success/failure counts and
+    moving windows of page and completion timestamps for pages/second and
+    ETA, so summaries never need to rescan the school list. The unit is a
+    school for detail runs and a district for listing runs, where the number
+    of schools is only known once their pages have been crawled.
+    """
+
+    def __init__(self, window=100, source=None, fingerprint=None, unit='schools'):
+        # Identifies the school list these numbers belong to
+        self.source = source
+        self.fingerprint = fingerprint
+        self.unit = unit
+        self.districts = {}
+        self.total = 0
+        self.completed = 0
+        self.success = 0
+        # Keys of schools currently failed, so a retried school is never counted twice
+        self.failed_keys = set()
+        self.skipped = 0
+        self.pages = 0
+        self.page_times = deque(maxlen=window)
+        self.completion_times = deque(maxlen=window)
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.last_flush = 0
+
+    def _district(self, district):
+        if district not in self.districts:
+            self.districts[district] = {'total': 0, 'completed': 0}
+        return self.districts[district]
+
+    def add_school(self, district, completed=False):
+        """Count a school towards its district (and as completed if it already has details)"""
+        stats = self._district(district)
+        stats['total'] += 1
+        self.total += 1
+        if completed:
+            stats['completed'] += 1
+            self.completed += 1
+
+    def add_district(self, district):
+        """Count a district still to be crawled (listing runs)"""
+        self._district(district)
+        self.total += 1
+
+    def add_listed(self, district, count=1):
+        """Count schools found on a district's listing pages (listing runs)"""
+        self._district(district)['total'] += count
+
+    def record_district(self, district, key):
+        """A district's listing pages were crawled (key: its URL)"""
+        self.completed += 1
+        self.success += 1
+        self.failed_keys.discard(key)
+        self.completion_times.append(time.monotonic())
+
+    def record_page(self):
+        """Tick the moving window for one fetched page"""
+        self.pages += 1
+        self.page_times.append(time.monotonic())
+
+    @property
+    def failed(self):
+        return len(self.failed_keys)
+
+    def record_success(self, district, key):
+        """A school's details were fetched and merged (key: its link)"""
+        self._district(district)['completed'] += 1
+        self.completed += 1
+        self.success += 1
+        self.failed_keys.discard(key)
+        self.completion_times.append(time.monotonic())
+        self.record_page()
+
+    def record_failure(self, district, key, fetched=True):
+        """A school's details could not be fetched (fetched=False when no request was made)"""
+        self.failed_keys.add(key)
+        if fetched:
+            self.record_page()
+
+    def record_skip(self):
+        """A school was skipped in this run because it already has details"""
+        self.skipped += 1
+
+    @staticmethod
+    def _rate(times):
+        if len(times) < 2:
+            return 0.0
+        elapsed = times[-1] - times[0]
+        return (len(times) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def pages_per_second(self):
+        """Page throughput over the moving window"""
+        return self._rate(self.page_times)
+
+    def completions_per_second(self):
+        """Completed units per second over the moving window (failed pages slow it down)"""
+        return self._rate(self.completion_times)
+
+    def remaining(self):
+        """Units (schools or districts) not completed yet"""
+        return max(0, self.total - self.completed)
+
+    def eta_seconds(self):
+        """Estimated seconds left at the current completion rate (None if unknown)"""
+        rate = self.completions_per_second()
+        return self.remaining() / rate if rate > 0 else None
+
+    def completion_pct(self):
+        return self.completed / self.total * 100 if self.total else 0.0
+
+    def district_summary(self, key='completed', limit=None):
+        """(district, total, completed, completion %) rows sorted by key, largest first"""
+        rows = [
+            (district, stats['total'], stats['completed'],
+             stats['completed'] / stats['total'] * 100 if stats['total'] else 0.0)
+            for district, stats in self.districts.items()
+        ]
+        index = 1 if key == 'total' else 2
+        rows.sort(key=lambda row: row[index], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def matches(self, source, fingerprint):
+        """True if these statistics were built for the given school list"""
+        return self.source == source and self.fingerprint == fingerprint
+
+    def to_dict(self):
+        # 'skipped' is per run: a resumed run skips the finished schools again
+        return {
+            'source': self.source,
+            'fingerprint': self.fingerprint,
+            'unit': self.unit,
+            'started_at': self.started_at,
+            'total': self.total,
+            'completed': self.completed,
+            'success': self.success,
+            'failed_keys': sorted(self.failed_keys),
+            'pages': self.pages,
+            'districts': self.districts,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(source=data.get('source'), fingerprint=data.get('fingerprint'), unit=data.get('unit', 'schools'))
+        stats.started_at = data.get('started_at', stats.started_at)
+        for field in ('total', 'completed', 'success', 'pages'):
+            setattr(stats, field, data.get(field, 0))
+        stats.failed_keys = set(data.get('failed_keys', []))
+        stats.districts = data.get('districts', {})
+        return stats
+
+    def status(self):
+        """Live status snapshot for the status file"""
+        eta = self.eta_seconds()
+        return {
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+            'started_at': self.started_at,
+            'unit': self.unit,
+            'total': self.total,
+            'completed': self.completed,
+            'completion_pct': round(self.completion_pct(), 1),
+            'success': self.success,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'success_rate': round(self.success / (self.success + self.failed) * 100, 1) if self.success + self.failed else None,
+            'pages_per_second': round(self.pages_per_second(), 2),
+            'eta_seconds': round(eta) if eta is not None else None,
+            'eta': datetime.fromtimestamp(time.time() + eta).isoformat(timespec='seconds') if eta is not None else None,
+        }
+
+    def flush_status(self, file_path=STATUS_FILE, interval=10, force=False):
+        """Write the status file at most once every interval seconds"""
+        now = time.monotonic()
+        if not force and now - self.last_flush < interval:
+            return False
+        self.last_flush = now
+        try:
+            with open(file_path, 'w', encoding='utf-8') as json_file:
+                json.dump(self.status(), json_file, indent=2)
+            return True
+        except Exception:
+            return False
+
+
+def schools_fingerprint(schools):
+    """Hash of the school links, in order, identifying a school list"""
+    digest = hashlib.sha1()
+    for school in schools:
+        digest.update(str(school.get('school_link', '')).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def save_stats(stats, file_path=STATS_FILE):
+    """Save run statistics next to the progress checkpoint"""
+    try:
+        with open(file_path, 'w', encoding='utf-8') as json_file:
+            json.dump(stats.to_dict(), json_file, indent=2, ensure_ascii=False)
+        return True
+    except Exception:
+        return False
+
+
+def load_stats(file_path=STATS_FILE):
+    """Load saved run statistics (None if there are none)"""
+    if not os.path.exists(file_path):
+        return None
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            return RunStats.from_dict(json.load(file))
+    except Exception as e:
+        print(f"✗ Error loading run statistics: {e}")
+        return None
+
+
+def clear_stats(file_path=STATS_FILE):
+    """Remove saved statistics once a run has finished"""
+    if os.path.exists(file_path):
+        os.remove(file_path)
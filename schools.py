@@ -62,9 +62,8 @@ def scrape_all_schools_from_file(file_path):
     
     return all_schools, next_url
 
-def scrape_all_schools_from_url(start_url):
-    """Scrape schools from URL and follow pagination"""
-    all_schools = []
+def iter_schools_from_url(start_url):
+    """Yield schools from URL page by page, following pagination"""
     current_url = start_url
     page_num = 1
     
@@ -79,25 +78,29 @@ def scrape_all_schools_from_url(start_url):
             
             # Extract schools
             schools = extract_schools_from_html(html_content)
-            all_schools.extend(schools)
             print(f"Extracted {len(schools)} schools from page {page_num}")
             
             # Get next page URL
             next_url = get_next_page_url(html_content)
-            
-            if next_url:
-                current_url = next_url
-                page_num += 1
-                time.sleep(1)  # Be polite to the server
-            else:
-                print("No more pages found")
-                current_url = None
                 
         except Exception as e:
             print(f"Error scraping page {page_num}: {e}")
             break
-    
-    return all_schools
+        
+        # Hand the page's schools to the caller before fetching the next page
+        yield from schools
+        
+        if next_url:
+            current_url = next_url
+            page_num += 1
+            time.sleep(1)  # Be polite to the server
+        else:
+            print("No more pages found")
+            current_url = None
+
+def scrape_all_schools_from_url(start_url):
+    """Scrape schools from URL and follow pagination"""
+    return list(iter_schools_from_url(start_url))
 
 def main():
     # First, extract from local file
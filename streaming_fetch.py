@@ -0,0 +1,226 @@
+import threading
+import time
+import zlib
+import requests
+
+CHUNK_SIZE = 4096
+
+# Detail pages: only the table inside div#schooldetails is needed
+DETAIL_START = b'id="schooldetails"'
+DETAIL_END = [b'</table>']
+
+# Listing pages: the catboxes, then the pagination block that follows them
+LISTING_START = b'class="catbox"'
+LISTING_END = [b'wp-pagenavi', b'</div>']
+
+# Running totals for the transfer report
+# bytes_read counts wire bytes (compressed if gzip); the sized_* totals only cover
+# responses that sent a Content-Length, so savings are never guessed
+transfer_stats = {'pages': 0, 'bytes_read': 0, 'sized_pages': 0, 'sized_bytes_read': 0, 'sized_bytes_total': 0, 'early_stops': 0}
+transfer_lock = threading.Lock()
+
+
+class MarkupScanner:
+    """
+    Scan a byte stream for the markup between a start marker and a chain of end markers
+
+    Bytes before the start marker are dropped as they arrive, and feed() reports
+    completion as soon as the last end marker has been seen so the caller can
+    stop reading.
+    """
+
+    def __init__(self, start_marker, end_markers):
+        self.start_marker = start_marker
+        self.end_markers = end_markers
+        self.buffer = bytearray()
+        self.started = False
+        self.stage = 0
+        self.search_from = 0
+        self.end = None
+
+    def feed(self, chunk):
+        """Add a chunk of bytes; returns True once the target markup is complete"""
+        self.buffer += chunk
+
+        if not self.started:
+            found = self.buffer.find(self.start_marker)
+            if found < 0:
+                # Keep a tail so a marker split across chunks is still found
+                del self.buffer[:max(0, len(self.buffer) - 256)]
+                return False
+
+            # Back up to the opening '<' of the tag that carries the marker
+            tag_start = self.buffer.rfind(b'<', 0, found)
+            del self.buffer[:max(0, tag_start)]
+            self.started = True
+            self.search_from = 0
+
+        while self.stage < len(self.end_markers):
+            marker = self.end_markers[self.stage]
+            found = self.buffer.find(marker, self.search_from)
+            if found < 0:
+                self.search_from = max(0, len(self.buffer) - len(marker) + 1)
+                return False
+            self.search_from = found + len(marker)
+            self.stage += 1
+
+        self.end = self.search_from
+        return True
+
+    def fragment(self, encoding='utf-8'):
+        """Decode just the captured markup ('' if the start marker never appeared)"""
+        if not self.started:
+            return ''
+        return bytes(self.buffer[:self.end]).decode(encoding, errors='replace')
+
+
+def response_encoding(response):
+    """Charset from the Content-Type header, defaulting to UTF-8"""
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        return response.encoding
+    return 'utf-8'
+
+
+def read_fragment(response, start_marker, end_markers):
+    """
+    Read a streamed response until the target markup is complete, then close it
+
+    Args:
+        response: requests.Response opened with stream=True
+        start_marker: Bytes that identify the opening tag of the target markup
+        end_markers: Byte markers that, found in order, end the target markup
+
+    Returns:
+        Decoded HTML fragment
+    """
+    scanner = MarkupScanner(start_marker, end_markers)
+    bytes_read = 0
+    complete = False
+    content_encoding = response.headers.get('Content-Encoding', '').lower()
+
+    try:
+        response.raise_for_status()
+        if content_encoding in ('', 'identity', 'gzip', 'deflate'):
+            # Read undecoded chunks so bytes_read is what came off the wire (chunked or not)
+            if content_encoding == 'gzip':
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            elif content_encoding == 'deflate':
+                decompressor = zlib.decompressobj()
+            else:
+                decompressor = None
+            for raw_chunk in response.raw.stream(CHUNK_SIZE, decode_content=False):
+                bytes_read += len(raw_chunk)
+                chunk = decompressor.decompress(raw_chunk) if decompressor else raw_chunk
+                if chunk and scanner.feed(chunk):
+                    complete = True
+                    break
+        else:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if scanner.feed(chunk):
+                    complete = True
+                    break
+            bytes_read = response.raw.tell()
+    finally:
+        # Closing mid-body drops the connection instead of draining the rest
+        response.close()
+
+    content_length = response.headers.get('Content-Length')
+
+    with transfer_lock:
+        transfer_stats['pages'] += 1
+        transfer_stats['bytes_read'] += bytes_read
+        if content_length and content_length.isdigit():
+            transfer_stats['sized_pages'] += 1
+            transfer_stats['sized_bytes_read'] += bytes_read
+            transfer_stats['sized_bytes_total'] += int(content_length)
+        if complete:
+            transfer_stats['early_stops'] += 1
+
+    return scanner.fragment(response_encoding(response))
+
+
+def read_detail_fragment(response):
+    """Read a streamed school detail page up to the end of the schooldetails table"""
+    return read_fragment(response, DETAIL_START, DETAIL_END)
+
+
+def read_listing_fragment(response):
+    """Read a streamed district listing page up to the end of the pagination block"""
+    return read_fragment(response, LISTING_START, LISTING_END)
+
+
+def fetch_listing_fragment(url, timeout=15):
+    """Fetch the catbox list and pagination of a district listing page"""
+    response = requests.get(url, timeout=timeout, stream=True)
+    return read_listing_fragment(response)
+
+
+def print_transfer_report():
+    """Print how many bytes early termination avoided downloading"""
+    if not transfer_stats['pages']:
+        return
+    print(f"Pages streamed: {transfer_stats['pages']} (stopped early: {transfer_stats['early_stops']})")
+    print(f"Bytes read from the wire: {transfer_stats['bytes_read']:,}")
+
+    # Savings are only known for responses that declared their size
+    if transfer_stats['sized_bytes_total']:
+        saved = transfer_stats['sized_bytes_total'] - transfer_stats['sized_bytes_read']
+        saved_pct = saved / transfer_stats['sized_bytes_total'] * 100
+        print(f"Pages with Content-Length: {transfer_stats['sized_pages']} | "
+              f"{transfer_stats['sized_bytes_read']:,} of {transfer_stats['sized_bytes_total']:,} bytes read ({saved_pct:.1f}% saved)")
+    else:
+        print("Total page size unknown (no Content-Length), savings not reported")
+
+
+def benchmark(runs=50):
+    """Compare full-page parsing with streamed fragment parsing on the saved HTML fixtures"""
+    from bulk_school_extractor import extract_schools_from_html, get_next_page_url
+    from master_school_details_extractor import extract_school_details_from_html
+
+    def parse_listing(html):
+        return extract_schools_from_html(html), get_next_page_url(html)
+
+    fixtures = [
+        ('Detail page', 'school_details.html', DETAIL_START, DETAIL_END, extract_school_details_from_html),
+        ('Listing page', 'schools-list.html', LISTING_START, LISTING_END, parse_listing),
+    ]
+
+    for label, file_path, start_marker, end_markers, parse in fixtures:
+        with open(file_path, 'rb') as file:
+            body = file.read()
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            full_result = parse(body.decode('utf-8'))
+        full_time = (time.perf_counter() - start) / runs
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            scanner = MarkupScanner(start_marker, end_markers)
+            bytes_read = 0
+            for offset in range(0, len(body), CHUNK_SIZE):
+                chunk = body[offset:offset + CHUNK_SIZE]
+                bytes_read += len(chunk)
+                if scanner.feed(chunk):
+                    break
+            stream_result = parse(scanner.fragment())
+        stream_time = (time.perf_counter() - start) / runs
+
+        match = '✓' if stream_result == full_result else '✗'
+        print(f"\n{label} ({file_path})")
+        print(f"  Bytes read: {bytes_read:,} of {len(body):,} ({(1 - bytes_read / len(body)) * 100:.1f}% saved)")
+        print(f"  Decoded: {len(scanner.fragment()):,} chars instead of {len(body.decode('utf-8')):,}")
+        print(f"  Parse time: {stream_time * 1000:.2f} ms vs {full_time * 1000:.2f} ms full page "
+              f"({full_time / stream_time:.1f}x faster)")
+        print(f"  {match} Same extracted data as full-page parse")
+
+
+def main():
+    print("="*70)
+    print("STREAMING FETCH BENCHMARK")
+    print("="*70)
+    benchmark()
+
+
+if __name__ == "__main__":
+    main()